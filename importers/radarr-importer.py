@@ -28,197 +28,598 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
 import sys
 import csv
+import argparse
 import json
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, FrozenSet, Set, Tuple
 from colorama import init, Fore, Style
 
+# orjson is optional but much faster on large lookup payloads
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
 # Initialize colorama for cross-platform color support
 init()
 
+# Colour codes resolved once instead of on every line of output
+BRIGHT = Style.BRIGHT
+RESET = Style.RESET_ALL
+GREEN = Fore.GREEN
+YELLOW = Fore.YELLOW
+RED = Fore.RED
+CYAN = Fore.CYAN
+SEPARATOR = f"{Fore.BLUE}{'-' * 40}{RESET}"
+
 # Configuration
 RADARR_URL = "http://localhost:7878"  # Change this to your Radarr URL
 API_KEY = ""                          # Add your Radarr API key here
 ROOT_FOLDER_PATH = ""                 # Add your movies root folder path
+MAX_WORKERS = 10                      # Maximum concurrent requests to Radarr
+MAX_RETRIES = 5                       # Attempts per request when Radarr is throttling
+BATCH_SIZE = 50                       # Movies per bulk import request
+REQUEST_TIMEOUT = 30                  # Seconds to wait for each response
+PROGRESS_INTERVAL = 0.033             # Minimum seconds between progress redraws
+PROCESS_THRESHOLD = 2000              # Rows above which the import is split across processes
+CACHE_TTL = 900                       # Seconds to reuse the cached Radarr library
+CACHE_FILE = Path("~/.cache/libretto/radarr_tmdb.json").expanduser()
 
 class Movie:
-    def __init__(self, title: str, year: str, tmdb_id: str) -> None:
+    __slots__ = ('title', 'year', 'tmdb_id')
+
+    def __init__(self, title: str, year: str, tmdb_id: int) -> None:
         self.title = title
         self.year = year
         self.tmdb_id = tmdb_id
 
 class ImportResults:
+    __slots__ = ('added_imports', 'existing_imports', 'failed_imports',
+                 'missing_ids', 'duplicate_ids', 'error_details')
+
     def __init__(self):
         self.added_imports = []  # type: List[str]
         self.existing_imports = []  # type: List[str]
         self.failed_imports = []  # type: List[str]
         self.missing_ids = []  # type: List[str]
+        self.duplicate_ids = []  # type: List[str]
         self.error_details = []  # type: List[str]
 
+    def __iadd__(self, other: 'ImportResults') -> 'ImportResults':
+        for name in self.__slots__:
+            getattr(self, name).extend(getattr(other, name))
+        return self
+
+class AdaptiveLimiter:
+    """Caps in-flight requests, halving on throttling and growing back on success."""
+
+    def __init__(self, initial: int, ceiling: int, grow_after: int = 20) -> None:
+        self._limit = initial
+        self._ceiling = ceiling
+        self._grow_after = grow_after
+        self._active = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self) -> 'AdaptiveLimiter':
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def shrink(self, retry_after: float) -> None:
+        with self._cond:
+            self._limit = max(1, self._limit // 2)
+            self._successes = 0
+        time.sleep(retry_after)
+
+    def grow(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self._grow_after and self._limit < self._ceiling:
+                self._limit += 1
+                self._successes = 0
+                self._cond.notify()
+
 class RadarrImporter:
-    def __init__(self, url: str, api_key: str, root_folder: str):
+    def __init__(self, url: str, api_key: str, root_folder: str, use_cache: bool = True,
+                 max_workers: int = MAX_WORKERS, existing_ids: Optional[FrozenSet[int]] = None,
+                 dry_run: bool = False):
         self.url = url.rstrip('/')
+        self._url_movie = f"{self.url}/api/v3/movie"
+        self._url_lookup = f"{self.url}/api/v3/movie/lookup/tmdb"
+        self._url_import = f"{self.url}/api/v3/movie/import"
         self.api_key = api_key
         self.root_folder = root_folder
-        self.session = requests.Session()
-        self.session.headers.update({'X-Api-Key': api_key})
+        self.max_workers = max_workers
+        self.dry_run = dry_run
+        self.session = self._create_session(api_key)
         self.results = ImportResults()
+        self._lock = threading.Lock()
+        self._limiter = AdaptiveLimiter(max(1, max_workers // 2), max_workers)
+        self._direct_add = None  # type: Optional[bool]
+        self._use_cache = use_cache
+        self._cache_time = time.time()
+        self._cache_stale = False
+        # Direct-add bodies only differ in tmdbId/title/year, so serialize the
+        # rest once and splice the per-movie fields in as bytes
+        self._payload_prefix = json_dumps({
+            'qualityProfileId': 1,
+            'rootFolderPath': root_folder,
+            'monitored': True,
+            'addOptions': {
+                'searchForMovie': True
+            }
+        })[:-1]
+        if existing_ids is None:
+            existing_ids = self._fetch_existing_ids()
+        self._existing_ids = existing_ids
+
+    def _create_session(self, api_key: str) -> requests.Session:
+        session = requests.Session()
+        # 429s are left to the AdaptiveLimiter so it can see the throttling
+        retry_strategy = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[500, 502, 503, 504],
+            respect_retry_after_header=False,
+            # Hand the last 5xx back so it is recorded against the item
+            raise_on_status=False,
+        )
+        # One pooled keep-alive connection per worker
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers,
+                              max_retries=retry_strategy)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({'X-Api-Key': api_key, 'Connection': 'keep-alive'})
+        return session
+
+    def _fetch_existing_ids(self) -> FrozenSet[int]:
+        cached = self._load_cache() if self._use_cache else None
+        if cached is not None:
+            return cached
 
-    def check_movie_exists(self, tmdb_id: str) -> bool:
-        response = self.session.get(f"{self.url}/api/v3/movie")
+        # Fetch the library once up front so each row is a set lookup
+        response = self._request('GET', self._url_movie)
         response.raise_for_status()
-        movies = response.json()
-        return any(movie.get('tmdbId') == int(tmdb_id) for movie in movies)
+        return frozenset(movie['tmdbId'] for movie in json_loads(response.content) if movie.get('tmdbId'))
 
-    def add_movie(self, movie: Movie) -> bool:
-        movie_entry = "{0} ({1})".format(movie.title, movie.year)
+    def _load_cache(self) -> Optional[FrozenSet[int]]:
+        try:
+            cache = json_loads(CACHE_FILE.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if cache.get('url') != self.url or time.time() - cache.get('ts', 0) > CACHE_TTL:
+            return None
+        self._cache_time = cache['ts']
+        return frozenset(cache['ids'])
 
-        # Check if movie already exists
-        if self.check_movie_exists(movie.tmdb_id):
-            self.results.existing_imports.append(movie_entry)
-            return True
+    def save_cache(self) -> None:
+        """Store the known TMDb IDs, or drop the cache if Radarr contradicted it."""
+        if not self._use_cache or self.dry_run:
+            return
+        try:
+            if self._cache_stale:
+                if CACHE_FILE.exists():
+                    CACHE_FILE.unlink()
+                return
+            CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            # Keep the original fetch time so the TTL still bounds staleness
+            CACHE_FILE.write_bytes(json_dumps({
+                'ts': self._cache_time,
+                'url': self.url,
+                'ids': sorted(self._existing_ids)
+            }))
+        except OSError:
+            pass
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if 'json' in kwargs:
+            kwargs['data'] = json_dumps(kwargs.pop('json'))
+        if 'data' in kwargs:
+            kwargs['headers'] = {'Content-Type': 'application/json'}
+
+        # Back off on 429s and refused connections instead of hammering the server
+        for attempt in range(MAX_RETRIES):
+            with self._limiter:
+                try:
+                    response = self.session.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
+                except requests.ConnectionError:
+                    if attempt == MAX_RETRIES - 1:
+                        raise
+                    retry_after = 1.0
+                else:
+                    if response.status_code != 429:
+                        self._limiter.grow()
+                        return response
+                    if attempt == MAX_RETRIES - 1:
+                        return response
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self._limiter.shrink(retry_after)
+
+    def _minimal_payload(self, movie: Movie) -> bytes:
+        body = b'%s,"tmdbId":%d,"title":%s' % (self._payload_prefix, movie.tmdb_id,
+                                               json_dumps(movie.title))
+        if movie.year.isdecimal():
+            body += b',"year":%d' % int(movie.year)
+        return body + b'}'
+
+    def _rejected(self, response: requests.Response) -> str:
+        # A rejected add usually means the library changed under the cache
+        if response.status_code == 400:
+            self._cache_stale = True
+        return http_error(response)
+
+    def _post_movie(self, movie: Movie) -> Optional[str]:
+        """Add a movie to Radarr, returning an error message if it failed."""
+        # Newer Radarr builds resolve the metadata themselves from a bare
+        # TMDb ID, which saves the lookup round trip. Probe that once and
+        # fall back to lookup + POST if the server rejects the payload.
+        probing = self._direct_add is None
+        if self._direct_add is not False and not self.dry_run:
+            response = self._request('POST', self._url_movie, data=self._minimal_payload(movie))
+            if response.ok:
+                self._direct_add = True
+                return None
+            if response.status_code != 400 or not probing:
+                return self._rejected(response)
+            self._direct_add = False
 
         # Get movie information from TMDb
+        response = self._request('GET', self._url_lookup, params={'tmdbId': movie.tmdb_id})
+        if response.status_code == 404 or not response.content:
+            return "No movie found"
+        if not response.ok:
+            return http_error(response)
+        movie_info = json_loads(response.content)
+
+        # Handle array response
+        if isinstance(movie_info, list):
+            if not movie_info:
+                return "No movie found"
+            movie_info = movie_info[0]
+
+        # A dry run stops once the lookup has confirmed the movie exists
+        if self.dry_run:
+            return None
+
+        # Add movie to Radarr
+        movie_info.update({
+            'qualityProfileId': 1,
+            'rootFolderPath': self.root_folder,
+            'monitored': True,
+            'addOptions': {
+                'searchForMovie': True
+            }
+        })
+
+        response = self._request('POST', self._url_movie, json=movie_info)
+        if not response.ok:
+            return self._rejected(response)
+        return None
+
+    def add_movie(self, movie: Movie) -> bool:
+        movie_entry = f"{movie.title} ({movie.year})"
+
+        # Check if movie already exists, claiming the ID while it is added
+        with self._lock:
+            if movie.tmdb_id in self._existing_ids:
+                self.results.existing_imports.append(movie_entry)
+                return True
+            self._existing_ids |= {movie.tmdb_id}
+
         try:
-            response = self.session.get(
-                "{0}/api/v3/movie/lookup/tmdb".format(self.url),
-                params={'tmdbId': movie.tmdb_id}
-            )
-            response.raise_for_status()
-            movie_info = response.json()
-            
-            # Handle array response
-            if isinstance(movie_info, list):
-                if not movie_info:
-                    raise ValueError("No movie found")
-                movie_info = movie_info[0]
-
-            # Add movie to Radarr
-            movie_info.update({
-                'qualityProfileId': 1,
-                'rootFolderPath': self.root_folder,
-                'monitored': True,
-                'addOptions': {
-                    'searchForMovie': True
-                }
-            })
-
-            response = self.session.post(
-                "{0}/api/v3/movie".format(self.url),
-                json=movie_info
-            )
-            response.raise_for_status()
-            
+            error = self._post_movie(movie)
+        except (requests.RequestException, ValueError) as e:
+            error = str(e)
+
+        if error is None:
             self.results.added_imports.append(movie_entry)
             return True
 
-        except Exception as e:
-            self.results.failed_imports.append(movie_entry)
-            self.results.error_details.append("{0} - Error: {1}".format(movie_entry, str(e)))
-            return False
+        with self._lock:
+            self._existing_ids -= {movie.tmdb_id}
+        self.results.failed_imports.append(movie_entry)
+        self.results.error_details.append(f"{movie_entry} - Error: {error}")
+        return False
+
+    def supports_batch_import(self) -> bool:
+        # An empty bulk import is a no-op, so it doubles as a capability probe
+        response = self._request('POST', self._url_import, json=[])
+        return response.ok
+
+    def add_movies_batch(self, movies: List[Movie]) -> None:
+        pending = {}  # type: Dict[int, Movie]
+        with self._lock:
+            for movie in movies:
+                if movie.tmdb_id in self._existing_ids:
+                    self.results.existing_imports.append(f"{movie.title} ({movie.year})")
+                else:
+                    self._existing_ids |= {movie.tmdb_id}
+                    pending[movie.tmdb_id] = movie
+
+        if not pending:
+            return
+
+        added = set()  # type: Set[int]
+        try:
+            response = self._request(
+                'POST', self._url_import,
+                data=b'[%s]' % b','.join(self._minimal_payload(movie) for movie in pending.values())
+            )
+            if response.ok:
+                added = {movie.get('tmdbId') for movie in json_loads(response.content)}
+        except (requests.RequestException, ValueError):
+            pass
+
+        for tmdb_id, movie in pending.items():
+            if tmdb_id in added:
+                self.results.added_imports.append(f"{movie.title} ({movie.year})")
+
+        # Radarr silently drops movies it can't add from a bulk import, so
+        # retry those one by one to get the lookup fallback and error details
+        retry = [movie for tmdb_id, movie in pending.items() if tmdb_id not in added]
+        with self._lock:
+            self._existing_ids -= {movie.tmdb_id for movie in retry}
+        for movie in retry:
+            self.add_movie(movie)
+
+    def has_movie(self, tmdb_id: int) -> bool:
+        with self._lock:
+            return tmdb_id in self._existing_ids
+
+    def import_chunk(self, movies: List[Movie], use_batch: bool) -> Tuple[ImportResults, FrozenSet[int], bool]:
+        """Import a chunk with this importer's own threads and report what changed."""
+        self.results = ImportResults()
+        known_ids = self._existing_ids
+        if use_batch:
+            self.add_movies_batch(movies)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for future in [executor.submit(self.add_movie, movie) for movie in movies]:
+                    future.result()
+        return self.results, self._existing_ids - known_ids, self._cache_stale
+
+    def merge(self, outcome: Tuple[ImportResults, FrozenSet[int], bool]) -> None:
+        """Fold a worker process's import_chunk() outcome into this importer."""
+        results, added_ids, cache_stale = outcome
+        with self._lock:
+            self.results += results
+            self._existing_ids |= added_ids
+            self._cache_stale = self._cache_stale or cache_stale
+
+# Importer owned by each worker process when a large CSV is split across processes
+_worker_importer = None  # type: Optional[RadarrImporter]
+
+def import_chunk_in_worker(movies: List[Movie], use_batch: bool, max_workers: int,
+                           dry_run: bool) -> Tuple[ImportResults, FrozenSet[int], bool]:
+    global _worker_importer
+    if _worker_importer is None:
+        # The parent already filtered out existing movies, so skip the library fetch
+        _worker_importer = RadarrImporter(RADARR_URL, API_KEY, ROOT_FOLDER_PATH, use_cache=False,
+                                  max_workers=max_workers, existing_ids=frozenset(),
+                                  dry_run=dry_run)
+    return _worker_importer.import_chunk(movies, use_batch)
+
+def parse_tmdb_id(value: str) -> int:
+    # Blank or malformed IDs become 0 and are reported as missing
+    value = value.strip()
+    return int(value) if value.isdecimal() else 0
+
+def http_error(response: requests.Response) -> str:
+    return f"{response.status_code} {response.reason} for url: {response.url}"
+
+def parse_retry_after(value: Optional[str]) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 1.0
+
+# Time and percentage of the last progress bar redraw
+_last_progress = {'time': 0.0, 'percentage': -1}
 
 def show_progress(current: int, total: int):
     percentage = (current * 100) // total
-    print("\r{0}Progress: {1:3d}% ({2}/{3}){4}".format(
-        Fore.CYAN, percentage, current, total, Style.RESET_ALL
-    ), end='')
+    now = time.monotonic()
+
+    # Redraw at most ~30 times a second unless the percentage moved or we're done
+    if (current != total and percentage == _last_progress['percentage']
+            and now - _last_progress['time'] < PROGRESS_INTERVAL):
+        return
+    _last_progress.update(time=now, percentage=percentage)
+
+    print(f"\r{CYAN}Progress: {percentage:3d}% ({current}/{total}){RESET}", end='')
     sys.stdout.flush()
 
-def print_summary(results: ImportResults):
-    print("\n{0}----------------------------------------{1}".format(Fore.BLUE, Style.RESET_ALL))
-    print("{0}Import Summary{1}".format(Style.BRIGHT, Style.RESET_ALL))
-    print("{0}----------------------------------------{1}".format(Fore.BLUE, Style.RESET_ALL))
-    
-    print("{0}Successfully added: {1} movies{2}".format(
-        Fore.GREEN, len(results.added_imports), Style.RESET_ALL))
-    
+def collect_finished(in_flight: Dict[Future, int],
+                     on_result: Optional[Callable[[Any], None]] = None) -> int:
+    """Wait for at least one in-flight future and return the CSV rows it covered."""
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    rows = 0
+    for future in done:
+        result = future.result()
+        if on_result is not None:
+            on_result(result)
+        rows += in_flight.pop(future)
+    return rows
+
+def print_summary(results: ImportResults, dry_run: bool = False):
+    # Build the whole summary first so it goes out in a single write
+    lines = [
+        "",
+        SEPARATOR,
+        f"{BRIGHT}Import Summary{RESET}",
+        SEPARATOR,
+        f"{GREEN}{'Would add' if dry_run else 'Successfully added'}: {len(results.added_imports)} movies{RESET}",
+    ]
+
     if results.existing_imports:
-        print("{0}Already in Radarr: {1} movies{2}".format(
-            Fore.YELLOW, len(results.existing_imports), Style.RESET_ALL))
-    
+        lines.append(f"{YELLOW}Already in Radarr: {len(results.existing_imports)} movies{RESET}")
+
     if results.failed_imports:
-        print("{0}Failed to import: {1} movies{2}".format(
-            Fore.RED, len(results.failed_imports), Style.RESET_ALL))
-    
+        lines.append(f"{RED}Failed to import: {len(results.failed_imports)} movies{RESET}")
+
     if results.missing_ids:
-        print("{0}Missing TMDb IDs: {1} movies{2}".format(
-            Fore.YELLOW, len(results.missing_ids), Style.RESET_ALL))
+        lines.append(f"{YELLOW}Missing TMDb IDs: {len(results.missing_ids)} movies{RESET}")
 
-    # Print details
-    if results.existing_imports:
-        print("\n{0}Already in Radarr:{1}".format(Style.BRIGHT, Style.RESET_ALL))
-        for movie in results.existing_imports:
-            print("  {0}".format(movie))
+    if results.duplicate_ids:
+        lines.append(f"{YELLOW}Duplicate rows: {len(results.duplicate_ids)} movies{RESET}")
 
-    if results.error_details:
-        print("\n{0}Failed Imports:{1}".format(Style.BRIGHT, Style.RESET_ALL))
-        for error in results.error_details:
-            print("  {0}".format(error))
+    # Print details
+    for header, entries in (("Already in Radarr:", results.existing_imports),
+                            ("Failed Imports:", results.error_details),
+                            ("Movies Missing TMDb IDs:", results.missing_ids),
+                            ("Duplicate Movies Skipped:", results.duplicate_ids)):
+        if entries:
+            lines.append(f"\n{BRIGHT}{header}{RESET}")
+            lines.extend(f"  {entry}" for entry in entries)
 
-    if results.missing_ids:
-        print("\n{0}Movies Missing TMDb IDs:{1}".format(Style.BRIGHT, Style.RESET_ALL))
-        for movie in results.missing_ids:
-            print("  {0}".format(movie))
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
-    if len(sys.argv) != 2:
-        print("{0}Usage: {1} <csv_file>{2}".format(Fore.RED, sys.argv[0], Style.RESET_ALL))
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Import movies to Radarr from a Libretto CSV file")
+    parser.add_argument('csv_file', help='CSV file exported by Libretto')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore the cached Radarr library and fetch it again')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Look up every movie without adding anything to Radarr')
+    args = parser.parse_args()
 
     if not API_KEY:
-        print("{0}Please set your Radarr API key in the script{1}".format(
-            Fore.RED, Style.RESET_ALL))
+        print(f"{RED}Please set your Radarr API key in the script{RESET}")
         sys.exit(1)
 
     if not ROOT_FOLDER_PATH:
-        print("{0}Please set your root folder path in the script{1}".format(
-            Fore.RED, Style.RESET_ALL))
+        print(f"{RED}Please set your root folder path in the script{RESET}")
         sys.exit(1)
 
-    csv_file = Path(sys.argv[1])
+    csv_file = Path(args.csv_file)
     if not csv_file.exists():
-        print("{0}CSV file not found: {1}{2}".format(
-            Fore.RED, csv_file, Style.RESET_ALL))
+        print(f"{RED}CSV file not found: {csv_file}{RESET}")
         sys.exit(1)
 
-    importer = RadarrImporter(RADARR_URL, API_KEY, ROOT_FOLDER_PATH)
+    try:
+        importer = RadarrImporter(RADARR_URL, API_KEY, ROOT_FOLDER_PATH,
+                                  use_cache=not args.no_cache, dry_run=args.dry_run)
+    except requests.RequestException as e:
+        print(f"{RED}Could not fetch existing library from Radarr: {e}{RESET}")
+        sys.exit(1)
     
-    print("\n{0}Starting Radarr Import Process{1}".format(Style.BRIGHT, Style.RESET_ALL))
-    print("{0}----------------------------------------{1}".format(Fore.BLUE, Style.RESET_ALL))
+    print(f"\n{BRIGHT}Starting Radarr Import Process{RESET}")
+    print(SEPARATOR)
 
     try:
+        # Count rows first so the CSV can be streamed instead of held in memory
         with open(str(csv_file), 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-            total_movies = len(rows)
-            
-            for i, row in enumerate(rows, 1):
-                show_progress(i, total_movies)
-                
-                movie = Movie(
-                    title=row['title'].strip(),
-                    year=row['year'].strip(),
-                    tmdb_id=row['tmdb_id'].strip()
-                )
-                
-                if movie.tmdb_id:
-                    importer.add_movie(movie)
-                else:
-                    importer.results.missing_ids.append("{0} ({1})".format(
-                        movie.title, movie.year))
+            total_movies = max(0, sum(1 for _ in f) - 1)
+
+        # Large CSVs are split across processes, each running its own share of the threads
+        processes = min(os.cpu_count() or 1, MAX_WORKERS)
+        use_processes = total_movies > PROCESS_THRESHOLD and processes > 1
+        if use_processes:
+            executor = ProcessPoolExecutor(max_workers=processes)
+            window = 2 * processes
+        else:
+            executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+            window = 2 * MAX_WORKERS
+        on_result = importer.merge if use_processes else None
+
+        def submit_batch(movies: List[Movie]) -> None:
+            if use_processes:
+                future = executor.submit(import_chunk_in_worker, movies, use_batch,
+                                         max(1, MAX_WORKERS // processes), args.dry_run)
+            else:
+                future = executor.submit(importer.add_movies_batch, movies)
+            in_flight[future] = len(movies)
+
+        with open(str(csv_file), 'r', encoding='utf-8') as f, executor:
+            in_flight = {}  # type: Dict[Future, int]
+            seen_ids = set()  # type: Set[int]
+            batch = []  # type: List[Movie]
+            use_batch = None  # type: Optional[bool]
+            completed = 0
+            try:
+                for row in csv.DictReader(f):
+                    movie = Movie(
+                        title=row['title'].strip(),
+                        year=row['year'].strip(),
+                        tmdb_id=parse_tmdb_id(row['tmdb_id'])
+                    )
+
+                    if not movie.tmdb_id:
+                        importer.results.missing_ids.append(f"{movie.title} ({movie.year})")
+                        completed += 1
+                        continue
+
+                    # Each TMDb ID only needs to reach Radarr once
+                    if movie.tmdb_id in seen_ids:
+                        importer.results.duplicate_ids.append(f"{movie.title} ({movie.year})")
+                        completed += 1
+                        continue
+                    seen_ids.add(movie.tmdb_id)
+
+                    if importer.has_movie(movie.tmdb_id):
+                        importer.results.existing_imports.append(f"{movie.title} ({movie.year})")
+                        completed += 1
+                        continue
+
+                    if use_batch is None:
+                        # The bulk endpoint can't look movies up without adding them
+                        use_batch = not args.dry_run and importer.supports_batch_import()
+
+                    if use_batch or use_processes:
+                        batch.append(movie)
+                        if len(batch) == BATCH_SIZE:
+                            submit_batch(batch)
+                            batch = []
+                    else:
+                        in_flight[executor.submit(importer.add_movie, movie)] = 1
+
+                    # Keep only a small window of rows queued ahead of the workers
+                    while len(in_flight) >= window:
+                        completed += collect_finished(in_flight, on_result)
+                        show_progress(completed, max(total_movies, completed))
+
+                if batch:
+                    submit_batch(batch)
+
+                while in_flight:
+                    completed += collect_finished(in_flight, on_result)
+                    show_progress(completed, max(total_movies, completed))
+            except BaseException:
+                # Don't start queued rows once the import is aborting
+                for future in in_flight:
+                    future.cancel()
+                raise
 
     except Exception as e:
-        print("\n{0}Error processing CSV file: {1}{2}".format(
-            Fore.RED, str(e), Style.RESET_ALL))
+        print(f"\n{RED}Error processing CSV file: {e}{RESET}")
         sys.exit(1)
 
+    importer.save_cache()
+
     print("\r" + " " * 80)  # Clear progress line
-    print_summary(importer.results)
-    print("\n{0}----------------------------------------{1}".format(Fore.BLUE, Style.RESET_ALL))
-    print("{0}Import process completed{1}".format(Style.BRIGHT, Style.RESET_ALL))
+    print_summary(importer.results, args.dry_run)
+    print(f"\n{SEPARATOR}")
+    print(f"{BRIGHT}Import process completed{RESET}")
 
 if __name__ == "__main__":
     main()
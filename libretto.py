@@ -32,85 +32,190 @@ import os
 import re
 import sys
 import argparse
+import configparser
+import contextlib
+import functools
 import logging
 import csv
 import html
+import hashlib
+import json
 import time
 import signal
+import queue
 import unicodedata
-import tempfile
 import threading
+from collections import Counter, deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, CancelledError, Future, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlencode
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-import xml.etree.ElementTree as ET
-from colorama import init, Fore, Back, Style
+
+# lxml is optional but parses large library pages much faster
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+class _NoColor:
+    """Stands in for colorama's Fore/Back/Style, rendering every code as ''."""
+    def __getattr__(self, name):
+        return ''
+
+Fore = Back = Style = _NoColor()
+
+def setup_colors(enabled: bool):
+    """Use colorama for terminal output, or plain text when piped or quiet."""
+    global Fore, Back, Style
+    if not enabled:
+        Fore = Back = Style = _NoColor()
+        return
+    from colorama import init, Fore, Back, Style
+    init(autoreset=True)
 
 # Initialize
-init(autoreset=True)
+setup_colors(sys.stdout.isatty() and sys.stderr.isatty())
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+@functools.lru_cache(maxsize=4096)
+def _clean_text(text: str) -> str:
+    # Studio, rating and similar fields repeat across items, hence the cache
+    text = html.unescape(text)
+    if not text.isascii():
+        text = unicodedata.normalize('NFC', text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+@functools.lru_cache(maxsize=256)
+def _format_rating(rating: str) -> str:
+    # Ratings only take ~100 distinct values, so this is effectively a lookup table
+    return f"{float(rating) * 10:.0f}%"
+
+@functools.lru_cache(maxsize=4096)
+def _format_timestamp(timestamp: str) -> str:
+    # Items added by the same scan share timestamps
+    return datetime.fromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S")
+
+def _pid_running_windows(pid: int) -> bool:
+    handle = windll.kernel32.OpenProcess(1, False, pid)
+    if handle == 0:
+        return False
+    windll.kernel32.CloseHandle(handle)
+    return True
+
+def _pid_running_posix(pid: int) -> bool:
+    os.kill(pid, 0)
+    # Where /proc exists, treat a reused PID as stale only if it clearly isn't
+    # Python; the script may run under another name or via python -m
+    try:
+        with open(f"/proc/{pid}/cmdline", 'rb') as f:
+            program = f.read().split(b'\0', 1)[0]
+    except OSError:
+        return True
+    return b'python' in os.path.basename(program).lower()
+
+# Resolve the platform-specific check once rather than on every call
+if sys.platform == "win32":
+    from ctypes import windll
+    _pid_running = _pid_running_windows
+else:
+    _pid_running = _pid_running_posix
 
 class CrossPlatformLock:
     """A cross-platform file locking mechanism."""
     
+    # Clearing a stale lock takes moments, so a claim older than this was left by a crash
+    BREAK_TIMEOUT = 30.0
+    
     def __init__(self, lock_file):
         self.lock_file = Path(lock_file)
-        self.lock_file_handle = None
+        self._break_file = self.lock_file.with_name(self.lock_file.name + '.break')
+        self._held = False
         self._lock = threading.Lock()
     
     def acquire(self):
         """Acquire a lock. Returns True if successful, False if already locked."""
         with self._lock:
-            if self.lock_file.exists():
-                try:
-                    # Check if the process ID in the lock file still exists
-                    with open(self.lock_file, 'r') as f:
-                        pid = int(f.read().strip())
-                    
-                    # Check if the process is still running
-                    if self._is_process_running(pid):
-                        return False
-                    
-                    # Process is not running, remove stale lock
-                    self.lock_file.unlink()
-                except (ValueError, OSError):
-                    # Invalid PID or file access error, remove lock file
-                    self.lock_file.unlink(missing_ok=True)
-            
+            # Write the PID first and link it into place, so the lock file is
+            # never seen empty and only one run can create it
+            tmp_file = self.lock_file.with_name(f"{self.lock_file.name}.{os.getpid()}.{threading.get_ident()}")
             try:
-                # Create lock file with current process ID
-                self.lock_file_handle = open(self.lock_file, 'w')
-                self.lock_file_handle.write(str(os.getpid()))
-                self.lock_file_handle.flush()
-                return True
+                tmp_file.write_text(str(os.getpid()))
+                if self._link(tmp_file, self.lock_file):
+                    self._held = True
+                    return True
+                if not self._is_stale():
+                    return False
+                
+                # Only one run may clear a stale lock at a time, or two could
+                # each remove the fresh lock the other just linked
+                if not self._link(tmp_file, self._break_file):
+                    self._clear_abandoned_break()
+                    return False
+                try:
+                    if self._is_stale():
+                        self.lock_file.unlink(missing_ok=True)
+                    self._held = self._link(tmp_file, self.lock_file)
+                    return self._held
+                finally:
+                    self._break_file.unlink(missing_ok=True)
             except OSError:
                 return False
+            finally:
+                tmp_file.unlink(missing_ok=True)
     
     def release(self):
         """Release the lock."""
         with self._lock:
-            if self.lock_file_handle:
-                self.lock_file_handle.close()
-                self.lock_file_handle = None
-            self.lock_file.unlink(missing_ok=True)
+            # Only remove the file if we created it, so releasing twice is harmless
+            if self._held:
+                self._held = False
+                self.lock_file.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _link(src: Path, dst: Path) -> bool:
+        """Create dst as a copy of src, or return False if dst already exists."""
+        try:
+            os.link(src, dst)
+        except FileExistsError:
+            return False
+        except OSError:
+            # No hard links on this filesystem, so fall back to an exclusive create
+            try:
+                with open(dst, 'x') as f:
+                    f.write(src.read_text())
+            except FileExistsError:
+                return False
+        return True
+    
+    def _is_stale(self) -> bool:
+        """Whether the lock file is gone or names a process that has exited."""
+        try:
+            with open(self.lock_file, 'r') as f:
+                pid = int(f.read().strip())
+        except FileNotFoundError:
+            return True
+        except (ValueError, OSError):
+            # Lock files are never written empty, so treat an unreadable one as held
+            return False
+        return not self._is_process_running(pid)
+    
+    def _clear_abandoned_break(self):
+        try:
+            if time.time() - self._break_file.stat().st_mtime > self.BREAK_TIMEOUT:
+                self._break_file.unlink(missing_ok=True)
+        except OSError:
+            pass
     
     def _is_process_running(self, pid):
         """Check if a process with given PID is running."""
         try:
-            if sys.platform == "win32":
-                # Windows
-                from ctypes import windll
-                handle = windll.kernel32.OpenProcess(1, False, pid)
-                if handle == 0:
-                    return False
-                windll.kernel32.CloseHandle(handle)
-                return True
-            else:
-                # Unix-like systems (Linux, macOS)
-                os.kill(pid, 0)
-                return True
+            return _pid_running(pid)
         except (OSError, AttributeError):
             return False
 
@@ -118,7 +223,26 @@ class PlexLibraryExporter:
     SCRIPT_VERSION = "1.0.3"
     DEFAULT_PLEX_URL = "http://localhost:32400"
     DEFAULT_OUTPUT_DIR = "exports"
-    PAGE_SIZE = 50
+    PAGE_SIZE = 1000
+    METADATA_WORKERS = 16
+    PAGE_WORKERS = 4
+    LIBRARY_WORKERS = 4
+    # Each concurrent export streams and prefetches its listing pages while its metadata workers run
+    CONNECTION_POOL_SIZE = LIBRARY_WORKERS * (METADATA_WORKERS + PAGE_WORKERS + 1)
+    WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+    READ_CHUNK_SIZE = 64 * 1024
+    PREFETCH_CHUNKS = 32
+    PROGRESS_INTERVAL = 0.1
+    MANIFEST_LOCK_TIMEOUT = 10.0
+    THROTTLE_RETRIES = 5
+    SIZE_UNITS = ('B', 'KiB', 'MiB', 'GiB', 'TiB')
+    CONFIG_KEYS = ('PLEX_URL', 'PLEX_TOKEN', 'FORCE', 'DEBUG', 'ENABLE_LOGGING', 'QUIET')
+    
+    __slots__ = (
+        'plex_url', 'plex_token', 'debug', 'quiet', 'force', 'enable_logging', 'show_progress',
+        'log_dir', 'config_dir', 'manifest_file', 'timestamp', 'log_file', 'error_log',
+        'session', '_backoff_until', '_backoff_lock', '_libraries', '_cancelled'
+    )
     
     def __init__(self):
         self.plex_url = self.DEFAULT_PLEX_URL
@@ -127,12 +251,12 @@ class PlexLibraryExporter:
         self.quiet = False
         self.force = False
         self.enable_logging = False
+        self.show_progress = True
         
         # Setup directories
         self.log_dir = Path("logs")
         self.config_dir = Path("config")
-        self.lock_file = Path(tempfile.gettempdir()) / "libretto.lock"
-        self.lock = CrossPlatformLock(self.lock_file)
+        self.manifest_file = Path.home() / ".cache" / "libretto" / "manifest.json"
         
         # Setup logging
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -141,60 +265,174 @@ class PlexLibraryExporter:
         
         # Setup HTTP session
         self.session = self._create_session()
+        
+        # Monotonic time before which no worker should send another request
+        self._backoff_until = 0.0
+        self._backoff_lock = threading.Lock()
+        
+        # Library sections, fetched once per run
+        self._libraries = None  # type: Optional[List[Dict]]
+        
+        # Set to make running exports give up at their next batch of rows
+        self._cancelled = threading.Event()
 
     def _create_session(self) -> requests.Session:
         session = requests.Session()
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
+            # 429s are handled in _fetch so every worker backs off together
+            respect_retry_after_header=False,
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # Keep enough idle connections for every concurrent worker to reuse one
+        adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=self.CONNECTION_POOL_SIZE,
+                              pool_block=False)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session
 
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> ET.Element:
+    def _fetch(self, endpoint: str, params: Optional[Dict] = None, stream: bool = False) -> requests.Response:
         headers = {
             "X-Plex-Token": self.plex_token,
             "Accept": "application/xml",
             "X-Plex-Client-Identifier": f"libretto-{self.SCRIPT_VERSION}",
             "X-Plex-Product": "Libretto (for Plex)",
-            "X-Plex-Version": self.SCRIPT_VERSION
+            "X-Plex-Version": self.SCRIPT_VERSION,
+            "Connection": "keep-alive"
         }
         
         url = f"{self.plex_url}{endpoint}"
-        response = self.session.get(url, headers=headers, params=params)
+        for attempt in range(self.THROTTLE_RETRIES):
+            self._wait_for_backoff()
+            response = self.session.get(url, headers=headers, params=params, stream=stream)
+            if response.status_code != 429 or attempt == self.THROTTLE_RETRIES - 1:
+                break
+            response.close()
+            self._back_off(self._parse_retry_after(response.headers.get('Retry-After'), 2 ** attempt))
+        if not response.ok:
+            response.close()
         response.raise_for_status()
-        return ET.fromstring(response.content)
+        
+        # Plex itself doesn't rate limit, but a proxy in front of it might
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            self._back_off(self._parse_retry_after(response.headers.get('Retry-After'), 1.0))
+        return response
+
+    def _wait_for_backoff(self):
+        delay = self._backoff_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _back_off(self, seconds: float):
+        """Pause every worker, not just the one that was throttled."""
+        with self._backoff_lock:
+            self._backoff_until = max(self._backoff_until, time.monotonic() + seconds)
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str], default: float) -> float:
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return default
+
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> ET.Element:
+        return ET.fromstring(self._fetch(endpoint, params).content)
 
-    def _get_paginated_results(self, endpoint: str) -> ET.Element:
+    def _get_total_size(self, endpoint: str) -> int:
         root = self._make_request(endpoint, {"X-Plex-Container-Start": 0, "X-Plex-Container-Size": 0})
-        total_size = int(root.get('totalSize', 0))
-        combined_root = ET.Element('MediaContainer')
+        return int(root.get('totalSize', 0))
+
+    def _page_params(self, start: int) -> Dict:
+        return {
+            "X-Plex-Container-Start": start,
+            "X-Plex-Container-Size": self.PAGE_SIZE
+        }
+
+    def _fetch_page(self, endpoint: str, start: int) -> bytes:
+        return self._fetch(endpoint, self._page_params(start)).content
+
+    def _iter_page_chunks(self, endpoint: str, tag: str, total_size: int) -> Iterator[List[ET.Element]]:
+        """Yield the items of a paginated listing in batches, detached from their page."""
+        if total_size <= 0:
+            return
+        starts = iter(range(self.PAGE_SIZE, total_size, self.PAGE_SIZE))
+        with ThreadPoolExecutor(max_workers=self.PAGE_WORKERS) as pool:
+            # The next few pages download while the first one streams through the parser
+            pending = deque(pool.submit(self._fetch_page, endpoint, start)
+                            for start in islice(starts, self.PAGE_WORKERS))
+            try:
+                with self._fetch(endpoint, self._page_params(0), stream=True) as response:
+                    yield from self._iter_page_items(response.iter_content(self.READ_CHUNK_SIZE), tag)
+                while pending:
+                    content = pending.popleft().result()
+                    for start in islice(starts, 1):
+                        pending.append(pool.submit(self._fetch_page, endpoint, start))
+                    yield from self._iter_page_items((content,), tag)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _iter_page_items(self, chunks: Iterable[bytes], tag: str) -> Iterator[List[ET.Element]]:
+        # Detach each item as soon as it is complete, so a streamed page
+        # never builds its full tree and a downloaded one is freed item by item
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        container = None
+        depth = 0
+        for chunk in chunks:
+            parser.feed(chunk)
+            items = []
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    if container is None:
+                        container = elem
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth == 1 and elem.tag == tag:
+                    container.remove(elem)
+                    items.append(elem)
+            if items:
+                yield items
+        parser.close()
+
+    def _iter_paginated_items(self, endpoint: str, tag: str, total_size: int) -> Iterator[ET.Element]:
+        """Yield each item of a paginated listing while a background thread fetches ahead."""
+        batches = queue.Queue(maxsize=self.PREFETCH_CHUNKS)
+        stop = threading.Event()
         
-        for start in range(0, total_size, self.PAGE_SIZE):
-            if not self.quiet:
-                current_page = (start // self.PAGE_SIZE) + 1
-                total_pages = (total_size + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-                print(f"\r{Fore.CYAN}Fetching page {current_page}/{total_pages} ({self.PAGE_SIZE} items per page){Style.RESET_ALL}", 
-                      end='', file=sys.stderr)
-            
-            params = {
-                "X-Plex-Container-Start": start,
-                "X-Plex-Container-Size": self.PAGE_SIZE
-            }
-            page_root = self._make_request(endpoint, params)
-            
-            for child in page_root:
-                combined_root.append(child)
-            
-            time.sleep(0.5)
+        def put(batch) -> bool:
+            # Give up once the consumer has gone away instead of blocking forever
+            while not stop.is_set():
+                try:
+                    batches.put(batch, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
         
-        if not self.quiet:
-            print(f"\n{Fore.GREEN}Successfully retrieved all pages{Style.RESET_ALL}", file=sys.stderr)
+        def produce():
+            try:
+                for items in self._iter_page_chunks(endpoint, tag, total_size):
+                    if not put(items):
+                        return
+                put(None)
+            except Exception as e:
+                put(e)
         
-        return combined_root
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                yield from batch
+        finally:
+            stop.set()
+            producer.join()
 
     def setup_logging(self):
         if not self.enable_logging:
@@ -212,17 +450,11 @@ class PlexLibraryExporter:
             ]
         )
 
-    def create_lock(self):
-        """Create a cross-platform lock."""
-        if not self.lock.acquire():
-            print(f"{Fore.RED}Error: Another instance is running{Style.RESET_ALL}", file=sys.stderr)
-            sys.exit(4)
-
-    def remove_lock(self, _):
-        """Remove the cross-platform lock."""
-        self.lock.release()
-
     def get_libraries(self) -> List[Dict]:
+        # Every export looks its library type up here, so only ask Plex once
+        if self._libraries is not None:
+            return self._libraries
+        
         root = self._make_request("/library/sections")
         libraries = []
         
@@ -230,18 +462,20 @@ class PlexLibraryExporter:
             libraries.append({
                 'title': directory.get('title'),
                 'key': directory.get('key'),
-                'type': directory.get('type')
+                'type': directory.get('type'),
+                'updated_at': directory.get('updatedAt'),
+                'content_changed_at': directory.get('contentChangedAt'),
+                'scanned_at': directory.get('scannedAt')
             })
         
+        self._libraries = libraries
         return libraries
 
     def format_duration(self, duration_ms: Optional[int]) -> str:
         if not duration_ms:
             return ""
         
-        total_minutes = duration_ms // 60000
-        hours = total_minutes // 60
-        minutes = total_minutes % 60
+        hours, minutes = divmod(duration_ms // 60000, 60)
         
         if hours > 0:
             return f"{hours}h {minutes}m"
@@ -250,24 +484,19 @@ class PlexLibraryExporter:
     def format_timestamp(self, timestamp: Optional[str]) -> str:
         if not timestamp:
             return ""
-        return datetime.fromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S")
+        return _format_timestamp(timestamp)
 
     def process_text_field(self, text: Optional[str]) -> str:
         if not text:
             return ""
-        text = html.unescape(text)
-        text = unicodedata.normalize('NFC', text)
-        return ' '.join(text.split())
+        return _clean_text(text)
 
     def _format_size(self, size_bytes: int) -> str:
         if size_bytes == 0:
             return "0B"
-        units = ['B', 'KiB', 'MiB', 'GiB', 'TiB']
-        i = 0
-        while size_bytes >= 1024 and i < len(units) - 1:
-            size_bytes /= 1024
-            i += 1
-        return f"{size_bytes:.1f}{units[i]}"
+        # Each unit is 10 more bits, so the bit length picks the unit directly
+        i = min((size_bytes.bit_length() - 1) // 10, len(self.SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (10 * i)):.1f}{self.SIZE_UNITS[i]}"
 
     def _get_movie_metadata(self, rating_key: str) -> Optional[str]:
         """Get full metadata for a specific movie including TMDB ID."""
@@ -315,6 +544,190 @@ class PlexLibraryExporter:
                 print(f"{Fore.YELLOW}Warning: Failed to get metadata for show {rating_key}: {str(e)}{Style.RESET_ALL}")
             return ""
 
+    @contextlib.contextmanager
+    def _open_output(self, output_file: Path):
+        """Write to a temporary file beside output_file, moving it into place only on success."""
+        tmp_file = output_file.with_suffix(output_file.suffix + '.tmp')
+        try:
+            # Nothing reads the temp file until the rename, so it can take a large buffer
+            with open(tmp_file, 'w', newline='', encoding='utf-8', buffering=self.WRITE_BUFFER_SIZE) as f:
+                yield f
+            os.replace(tmp_file, output_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+
+    def _iter_row_batches(self, endpoint: str, tag: str, total_size: int,
+                          build_row: Callable[[ET.Element], List[str]],
+                          fetch_tmdb_id: Optional[Callable[[str], Optional[str]]],
+                          tmdb_column: int) -> Iterator[List[List[str]]]:
+        """Yield finished rows in listing order, as many at a time as are ready."""
+        # Rows wait here in order while their TMDB lookups run in the background
+        pending = deque()  # type: Deque[Tuple[List[str], Optional[Future]]]
+        with ThreadPoolExecutor(max_workers=self.METADATA_WORKERS) as executor:
+            for item in self._iter_paginated_items(endpoint, tag, total_size):
+                row = build_row(item)
+                rating_key = item.get('ratingKey')
+                future = None
+                # Only items the listing had no tmdb:// Guid for need their own request
+                if fetch_tmdb_id and rating_key and not row[tmdb_column]:
+                    future = executor.submit(fetch_tmdb_id, rating_key)
+                pending.append((row, future))
+                if len(pending) > 2 * self.METADATA_WORKERS:
+                    yield self._take_ready_rows(pending, tmdb_column)
+            
+            while pending:
+                yield self._take_ready_rows(pending, tmdb_column)
+
+    @staticmethod
+    def _take_ready_rows(pending: Deque[Tuple[List[str], Optional[Future]]], tmdb_column: int) -> List[List[str]]:
+        # Wait for the oldest row, then take every row behind it that is already complete
+        rows = []
+        while pending:
+            row, future = pending[0]
+            if rows and future is not None and not future.done():
+                break
+            pending.popleft()
+            if future is not None:
+                row[tmdb_column] = future.result() or ""
+            rows.append(row)
+        return rows
+
+    def _export_items(self, writer, endpoint: str, tag: str, build_row: Callable[[ET.Element], List[str]],
+                      label: str, fetch_tmdb_id: Optional[Callable[[str], Optional[str]]] = None,
+                      tmdb_column: int = 0) -> int:
+        """Stream a library listing into the CSV writer, returning the number of rows written."""
+        total_items = self._get_total_size(endpoint)
+        items_exported = 0
+        
+        show_progress = self.show_progress and not self.quiet
+        progress = f"\r{Fore.CYAN}Exporting {label}: {{}}/{total_items} ({{:.1f}}%){Style.RESET_ALL}"
+        last_progress = 0.0
+        
+        for rows in self._iter_row_batches(endpoint, tag, total_items, build_row, fetch_tmdb_id, tmdb_column):
+            if self._cancelled.is_set():
+                raise RuntimeError("Export cancelled")
+            writer.writerows(rows)
+            items_exported += len(rows)
+            
+            # Redraw at most every PROGRESS_INTERVAL seconds, and always for the last row
+            if show_progress:
+                now = time.monotonic()
+                if items_exported >= total_items or now - last_progress >= self.PROGRESS_INTERVAL:
+                    last_progress = now
+                    print(progress.format(items_exported, (items_exported/total_items)*100), end='', file=sys.stderr)
+        
+        return items_exported
+
+    @staticmethod
+    def _find_tmdb_id(item: ET.Element) -> str:
+        """Return the TMDB ID from an item's inline Guid children, if the listing included them."""
+        for guid in item.iterfind('Guid'):
+            guid_id = guid.get('id', '')
+            if 'tmdb://' in guid_id:
+                return guid_id.split('tmdb://')[-1]
+        return ""
+
+    @staticmethod
+    def _collect_tags(item: ET.Element) -> Dict[str, List[str]]:
+        """Group an item's Genre/Country/Director/Writer/Role tags in one pass over its children."""
+        tags = {'Genre': [], 'Country': [], 'Director': [], 'Writer': [], 'Role': []}
+        for child in item:
+            values = tags.get(child.tag)
+            if values is not None:
+                values.append(child.get('tag', ''))
+        return tags
+
+    def _movie_row(self, video: ET.Element) -> List[str]:
+        media = video.find('Media')
+        part = video.find('Media/Part')
+        
+        rating = video.get('rating')
+        audience_rating = video.get('audienceRating')
+        
+        tags = self._collect_tags(video)
+        genres = ' , '.join(tags['Genre'])
+        countries = ' , '.join(tags['Country'])
+        directors = ' , '.join(tags['Director'])
+        writers = ' , '.join(tags['Writer'])
+        actors = ' , '.join(tags['Role'])
+        
+        return [
+            self.process_text_field(video.get('title')),
+            video.get('year', ''),
+            self._find_tmdb_id(video),
+            str(int(video.get('duration', 0)) // 60000),
+            self.process_text_field(video.get('studio')),
+            video.get('contentRating', ''),
+            self.process_text_field(video.get('summary')),
+            _format_rating(rating) if rating else '',
+            _format_rating(audience_rating) if audience_rating else '',
+            self.process_text_field(video.get('tagline')),
+            video.get('originallyAvailableAt', ''),
+            self.format_timestamp(video.get('addedAt')),
+            self.format_timestamp(video.get('updatedAt')),
+            media.get('videoResolution', '') if media is not None else '',
+            media.get('audioChannels', '') if media is not None else '',
+            media.get('audioCodec', '') if media is not None else '',
+            media.get('videoCodec', '') if media is not None else '',
+            media.get('container', '') if media is not None else '',
+            media.get('videoFrameRate', '') if media is not None else '',
+            self._format_size(int(part.get('size', 0))) if part is not None else '',
+            genres,
+            countries,
+            directors,
+            writers,
+            actors
+        ]
+
+    def _show_row(self, show: ET.Element) -> List[str]:
+        audience_rating = show.get('audienceRating')
+        
+        tags = self._collect_tags(show)
+        genres = ' , '.join(tags['Genre'])
+        countries = ' , '.join(tags['Country'])
+        actors = ' , '.join(tags['Role'])
+        
+        return [
+            self.process_text_field(show.get('title')),
+            self._find_tmdb_id(show),
+            show.get('leafCount', '0'),
+            show.get('childCount', '0'),
+            self.process_text_field(show.get('studio')),
+            show.get('contentRating', ''),
+            self.process_text_field(show.get('summary')),
+            _format_rating(audience_rating) if audience_rating else '',
+            show.get('year', ''),
+            self.format_duration(int(show.get('duration', 0))),
+            show.get('originallyAvailableAt', ''),
+            self.format_timestamp(show.get('addedAt')),
+            self.format_timestamp(show.get('updatedAt')),
+            genres,
+            countries,
+            actors
+        ]
+
+    def _album_row(self, album: ET.Element) -> List[str]:
+        genres = ' , '.join(self._collect_tags(album)['Genre'])
+        
+        return [
+            self.process_text_field(album.get('parentTitle')),
+            self.process_text_field(album.get('title')),
+            album.get('year', ''),
+            genres,
+            self.process_text_field(album.get('studio')),
+            self.format_timestamp(album.get('addedAt')),
+            self.format_timestamp(album.get('updatedAt'))
+        ]
+
+    def _list_endpoint(self, library_id: str, item_type: int) -> str:
+        """Build the listing URL for one item type, asking only for what the export reads."""
+        params = {"type": item_type}
+        # Movies and shows need their Guids inline for the tmdb_id column
+        if item_type in (1, 2):
+            params["includeGuids"] = 1
+        return f"/library/sections/{library_id}/all?{urlencode(params)}"
+
     def export_movie_library(self, library_id: str, output_file: Path) -> Tuple[bool, int]:
         headers = [
             'title', 'year', 'tmdb_id', 'duration', 'studio', 'content_rating', 'summary',
@@ -324,70 +737,13 @@ class PlexLibraryExporter:
             'size', 'genres', 'countries', 'directors', 'writers', 'actors'
         ]
         
-        items_exported = 0
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        with self._open_output(output_file) as f:
             writer = csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_ALL)
             writer.writerow(headers)
             
-            root = self._get_paginated_results(f"/library/sections/{library_id}/all?type=1")
-            total_items = len(root.findall(".//Video"))
-            
-            for i, video in enumerate(root.findall(".//Video"), 1):
-                if not self.quiet:
-                    print(f"\r{Fore.CYAN}Exporting movies: {i}/{total_items} ({(i/total_items)*100:.1f}%){Style.RESET_ALL}", 
-                          end='', file=sys.stderr)
-                
-                rating_key = video.get('ratingKey')
-                tmdb_id = self._get_movie_metadata(rating_key) if rating_key else ""
-                
-                media = video.find('.//Media')
-                part = video.find('.//Media/Part')
-                
-                rating = video.get('rating')
-                if rating:
-                    rating = f"{float(rating) * 10:.0f}%"
-                
-                audience_rating = video.get('audienceRating')
-                if audience_rating:
-                    audience_rating = f"{float(audience_rating) * 10:.0f}%"
-                
-                genres = ' , '.join(g.get('tag', '') for g in video.findall('.//Genre'))
-                countries = ' , '.join(c.get('tag', '') for c in video.findall('.//Country'))
-                directors = ' , '.join(d.get('tag', '') for d in video.findall('.//Director'))
-                writers = ' , '.join(w.get('tag', '') for w in video.findall('.//Writer'))
-                actors = ' , '.join(a.get('tag', '') for a in video.findall('.//Role'))
-                
-                row = [
-                    self.process_text_field(video.get('title')),
-                    video.get('year', ''),
-                    tmdb_id,
-                    str(int(video.get('duration', 0)) // 60000),
-                    self.process_text_field(video.get('studio')),
-                    video.get('contentRating', ''),
-                    self.process_text_field(video.get('summary')),
-                    rating or '',
-                    audience_rating or '',
-                    self.process_text_field(video.get('tagline')),
-                    video.get('originallyAvailableAt', ''),
-                    self.format_timestamp(video.get('addedAt')),
-                    self.format_timestamp(video.get('updatedAt')),
-                    media.get('videoResolution', '') if media is not None else '',
-                    media.get('audioChannels', '') if media is not None else '',
-                    media.get('audioCodec', '') if media is not None else '',
-                    media.get('videoCodec', '') if media is not None else '',
-                    media.get('container', '') if media is not None else '',
-                    media.get('videoFrameRate', '') if media is not None else '',
-                    self._format_size(int(part.get('size', 0))) if part is not None else '',
-                    genres,
-                    countries,
-                    directors,
-                    writers,
-                    actors
-                ]
-                writer.writerow(row)
-                items_exported += 1
-                
-                time.sleep(0.1)
+            items_exported = self._export_items(
+                writer, self._list_endpoint(library_id, 1), 'Video', self._movie_row,
+                "movies", self._get_movie_metadata, tmdb_column=2)
             
             if not self.quiet:
                 print(f"\n{Fore.GREEN}Exported {items_exported} movies{Style.RESET_ALL}")
@@ -401,52 +757,13 @@ class PlexLibraryExporter:
             'added_at', 'updated_at', 'genres', 'countries', 'actors'
         ]
         
-        items_exported = 0
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        with self._open_output(output_file) as f:
             writer = csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_ALL)
             writer.writerow(headers)
             
-            root = self._get_paginated_results(f"/library/sections/{library_id}/all?type=2")
-            total_items = len(root.findall(".//Directory"))
-            
-            for i, show in enumerate(root.findall(".//Directory"), 1):
-                if not self.quiet:
-                    print(f"\r{Fore.CYAN}Exporting TV shows: {i}/{total_items} ({(i/total_items)*100:.1f}%){Style.RESET_ALL}", 
-                          end='', file=sys.stderr)
-                
-                rating_key = show.get('ratingKey')
-                tmdb_id = self._get_show_metadata(rating_key) if rating_key else ""
-                
-                audience_rating = show.get('audienceRating')
-                if audience_rating:
-                    audience_rating = f"{float(audience_rating) * 10:.0f}%"
-                
-                genres = ' , '.join(g.get('tag', '') for g in show.findall('.//Genre'))
-                countries = ' , '.join(c.get('tag', '') for c in show.findall('.//Country'))
-                actors = ' , '.join(a.get('tag', '') for a in show.findall('.//Role'))
-                
-                row = [
-                    self.process_text_field(show.get('title')),
-                    tmdb_id,
-                    show.get('leafCount', '0'),
-                    show.get('childCount', '0'),
-                    self.process_text_field(show.get('studio')),
-                    show.get('contentRating', ''),
-                    self.process_text_field(show.get('summary')),
-                    audience_rating or '',
-                    show.get('year', ''),
-                    self.format_duration(int(show.get('duration', 0))),
-                    show.get('originallyAvailableAt', ''),
-                    self.format_timestamp(show.get('addedAt')),
-                    self.format_timestamp(show.get('updatedAt')),
-                    genres,
-                    countries,
-                    actors
-                ]
-                writer.writerow(row)
-                items_exported += 1
-                
-                time.sleep(0.1)
+            items_exported = self._export_items(
+                writer, self._list_endpoint(library_id, 2), 'Directory', self._show_row,
+                "TV shows", self._get_show_metadata, tmdb_column=1)
             
             if not self.quiet:
                 print(f"\n{Fore.GREEN}Exported {items_exported} TV shows{Style.RESET_ALL}")
@@ -459,32 +776,13 @@ class PlexLibraryExporter:
             'added_at', 'updated_at'
         ]
         
-        items_exported = 0
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        with self._open_output(output_file) as f:
             writer = csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_ALL)
             writer.writerow(headers)
             
-            root = self._get_paginated_results(f"/library/sections/{library_id}/all?type=9")
-            total_items = len(root.findall(".//Directory"))
-            
-            for i, album in enumerate(root.findall(".//Directory"), 1):
-                if not self.quiet:
-                    print(f"\r{Fore.CYAN}Exporting albums: {i}/{total_items} ({(i/total_items)*100:.1f}%){Style.RESET_ALL}", 
-                          end='', file=sys.stderr)
-                
-                genres = ' , '.join(g.get('tag', '') for g in album.findall('.//Genre'))
-                
-                row = [
-                    self.process_text_field(album.get('parentTitle')),
-                    self.process_text_field(album.get('title')),
-                    album.get('year', ''),
-                    genres,
-                    self.process_text_field(album.get('studio')),
-                    self.format_timestamp(album.get('addedAt')),
-                    self.format_timestamp(album.get('updatedAt'))
-                ]
-                writer.writerow(row)
-                items_exported += 1
+            items_exported = self._export_items(
+                writer, self._list_endpoint(library_id, 9), 'Directory', self._album_row,
+                "albums")
             
             if not self.quiet:
                 print(f"\n{Fore.GREEN}Exported {items_exported} albums{Style.RESET_ALL}")
@@ -532,9 +830,10 @@ class PlexLibraryExporter:
                         print(''.join(f.readlines()[:5]))
                 return True, items_exported
             else:
+                # An empty library isn't an error, but report it as exporting nothing
                 print(f"{Fore.YELLOW}Warning: No data was exported to {output_file}{Style.RESET_ALL}", 
                       file=sys.stderr)
-                return False, 0
+                return success, 0
                 
         except Exception as e:
             print(f"{Fore.RED}Error during export: {str(e)}{Style.RESET_ALL}", file=sys.stderr)
@@ -543,8 +842,107 @@ class PlexLibraryExporter:
                 traceback.print_exc()
             return False, 0
 
+    def cancel(self):
+        """Stop every running export; their partial output files are discarded."""
+        self._cancelled.set()
+
+    def export_library_exclusive(self, library_id: str, output_file: Path) -> Optional[Tuple[bool, int]]:
+        """Export while holding a lock beside output_file, or return None if another run holds it."""
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        lock = CrossPlatformLock(output_file.with_suffix(output_file.suffix + '.lock'))
+        if not lock.acquire():
+            return None
+        try:
+            return self.export_library(library_id, output_file)
+        finally:
+            lock.release()
+
+    def load_manifest(self) -> Dict[str, Dict]:
+        """Load the record of previous exports, starting afresh if it is missing or unreadable."""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, entries: Dict[str, Dict]):
+        """Merge this run's entries into the manifest on disk."""
+        lock = CrossPlatformLock(self.manifest_file.with_suffix('.lock'))
+        tmp_file = self.manifest_file.with_suffix('.tmp')
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            deadline = time.monotonic() + self.MANIFEST_LOCK_TIMEOUT
+            while not lock.acquire():
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"{lock.lock_file} is held by another run")
+                time.sleep(0.05)
+            try:
+                # Re-read under the lock so entries saved by a concurrent run are kept
+                manifest = self.load_manifest()
+                manifest.update(entries)
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, indent=2, sort_keys=True)
+                os.replace(tmp_file, self.manifest_file)
+            finally:
+                lock.release()
+        except OSError as e:
+            tmp_file.unlink(missing_ok=True)
+            print(f"{Fore.YELLOW}Warning: Could not save export manifest: {str(e)}{Style.RESET_ALL}",
+                  file=sys.stderr)
+
+    def _file_sha256(self, path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.READ_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _manifest_source(self, library: Dict) -> Dict:
+        # Anything that would change the file's contents if it were exported again.
+        # updatedAt alone doesn't always move when items are edited, so the
+        # section's content change and scan times are part of the key too.
+        return {
+            'plex_url': self.plex_url,
+            'key': library['key'],
+            'updated_at': library.get('updated_at'),
+            'content_changed_at': library.get('content_changed_at'),
+            'scanned_at': library.get('scanned_at'),
+            'version': self.SCRIPT_VERSION
+        }
+
+    def record_export(self, entries: Dict[str, Dict], library: Dict, output_file: Path, items_exported: int,
+                      checksum: bool = False):
+        entry = self._manifest_source(library)
+        # Re-reading the whole export to hash it only pays off when -c will check it
+        if checksum:
+            entry['sha256'] = self._file_sha256(output_file)
+        entry['items'] = items_exported
+        entries[str(output_file.resolve())] = entry
+
+    def is_unchanged(self, manifest: Dict[str, Dict], library: Dict, output_file: Path) -> bool:
+        """Whether output_file is exactly what exporting library again would write."""
+        entry = manifest.get(str(output_file.resolve()))
+        if not entry or 'sha256' not in entry or not library.get('updated_at'):
+            return False
+        source = self._manifest_source(library)
+        if any(entry.get(name) != value for name, value in source.items()):
+            return False
+        try:
+            return entry.get('sha256') == self._file_sha256(output_file)
+        except OSError:
+            return False
+
     def load_config(self):
-        """Load configuration from config file"""
+        """Load configuration from LIBRETTO_* environment variables and the config file"""
+        env = {key: os.environ[f"LIBRETTO_{key}"] for key in self.CONFIG_KEYS
+               if f"LIBRETTO_{key}" in os.environ}
+        
+        # With the server settings in the environment the file isn't needed at all
+        if "PLEX_URL" in env and "PLEX_TOKEN" in env:
+            self._apply_config(env)
+            return
+        
         config_file = self.config_dir / "libretto.conf"
         
         # Create default config if it doesn't exist
@@ -593,24 +991,36 @@ QUIET=false'''
             
         # Load config
         try:
-            config = {}
-            with open(config_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip().strip('"')  # Remove quotes if present
-                        config[key] = value
-
-            self.plex_url = config.get("PLEX_URL", self.DEFAULT_PLEX_URL)
-            self.plex_token = config.get("PLEX_TOKEN", "")
-            self.force = config.get("FORCE", "false").lower() == "true"
-            self.debug = config.get("DEBUG", "false").lower() == "true"
-            self.enable_logging = config.get("ENABLE_LOGGING", "false").lower() == "true"
-            self.quiet = config.get("QUIET", "false").lower() == "true"
+            config = self._read_config_file(config_file)
         except Exception as e:
             print(f"{Fore.YELLOW}Warning: Could not read configuration file: {e}{Style.RESET_ALL}", file=sys.stderr)
+            config = {}
+        
+        # The environment still applies when the file can't be read
+        config.update(env)
+        self._apply_config(config)
+
+    def _read_config_file(self, config_file: Path) -> Dict[str, str]:
+        # The file is a bare KEY=value list, so give configparser a section to hang it on
+        parser = configparser.RawConfigParser(delimiters=('=',), comment_prefixes=('#',), strict=False)
+        parser.optionxform = str
+        with open(config_file, 'r', encoding='utf-8') as f:
+            try:
+                # Strip indentation so no line is mistaken for a continuation, and
+                # drop [section] lines so the keys after one aren't hidden in it
+                lines = (line.strip() for line in f)
+                parser.read_string("[libretto]\n" + "\n".join(line for line in lines if not line.startswith('[')))
+            except configparser.ParsingError:
+                pass  # Lines that aren't KEY=value are skipped; the rest still parse
+        return {key: value.strip('"') for key, value in parser.items('libretto')}
+
+    def _apply_config(self, config: Dict[str, str]):
+        self.plex_url = config.get("PLEX_URL", self.DEFAULT_PLEX_URL)
+        self.plex_token = config.get("PLEX_TOKEN", "")
+        self.force = config.get("FORCE", "false").lower() == "true"
+        self.debug = config.get("DEBUG", "false").lower() == "true"
+        self.enable_logging = config.get("ENABLE_LOGGING", "false").lower() == "true"
+        self.quiet = config.get("QUIET", "false").lower() == "true"
 
 
 def main():
@@ -632,6 +1042,10 @@ def main():
                        help=f'Output directory (default: {PlexLibraryExporter.DEFAULT_OUTPUT_DIR})')
     parser.add_argument('-f', '--force', action='store_true',
                        help='Force overwrite of existing files')
+    parser.add_argument('-c', '--changed', action='store_true',
+                       help='Skip libraries unchanged since their last export; add -f to re-export the rest')
+    parser.add_argument('--fail-fast', action='store_true',
+                       help='Stop exporting libraries after the first failure')
     parser.add_argument('-q', '--quiet', action='store_true',
                        help='Quiet mode (no stdout output)')
     parser.add_argument('-v', '--debug', action='store_true',
@@ -656,90 +1070,178 @@ def main():
     if args.debug:
         exporter.debug = True
     
+    if exporter.quiet:
+        setup_colors(False)
+    
     # Validate required parameters
     if not exporter.plex_token:
         parser.error(f"{Fore.RED}Plex token is required. Use -t option.{Style.RESET_ALL}")
     
-    # Setup logging and create lock
+    # Setup logging
     exporter.setup_logging()
-    lock_fd = exporter.create_lock()
     
-    try:
-        if args.list:
-            # List libraries
-            libraries = exporter.get_libraries()
-            print(f"{Fore.CYAN}Available libraries:{Style.RESET_ALL}")
-            for lib in libraries:
-                print(f"  {Fore.GREEN}{lib['title']}{Style.RESET_ALL} (ID: {lib['key']}, Type: {lib['type']})")
-            return 0
-        
-        # Set output file
-        output_file = None
-        if args.name:
-            if args.output:
-                output_file = Path(args.output)
-            else:
-                output_name = f"{args.name.replace(' ', '-')}.csv"
-                if args.dir:
-                    output_file = Path(args.dir) / output_name
-                else:
-                    output_file = Path(PlexLibraryExporter.DEFAULT_OUTPUT_DIR) / output_name
-            
-            # Find library ID by name
-            libraries = exporter.get_libraries()
-            library = next((lib for lib in libraries if lib['title'] == args.name), None)
-            
-            if not library:
-                print(f"{Fore.RED}Error: Library '{args.name}' not found{Style.RESET_ALL}", file=sys.stderr)
-                return 1
-                
-            success, items_exported = exporter.export_library(library['key'], output_file)
-            return 0 if success else 1
+    if args.list:
+        # List libraries
+        libraries = exporter.get_libraries()
+        print(f"{Fore.CYAN}Available libraries:{Style.RESET_ALL}")
+        for lib in libraries:
+            print(f"  {Fore.GREEN}{lib['title']}{Style.RESET_ALL} (ID: {lib['key']}, Type: {lib['type']})")
+        return 0
+    
+    # Set output file
+    output_file = None
+    if args.name:
+        if args.output:
+            output_file = Path(args.output)
         else:
-            # Export all libraries
-            export_dir = Path(args.dir or PlexLibraryExporter.DEFAULT_OUTPUT_DIR)
-            export_dir.mkdir(parents=True, exist_ok=True)
-            
-            libraries = exporter.get_libraries()
-            success_count = 0
-            failure_count = 0
-            skipped_count = 0
-            total_items_exported = 0
+            output_name = f"{args.name.replace(' ', '-')}.csv"
+            if args.dir:
+                output_file = Path(args.dir) / output_name
+            else:
+                output_file = Path(PlexLibraryExporter.DEFAULT_OUTPUT_DIR) / output_name
+        
+        # Find library ID by name
+        libraries = exporter.get_libraries()
+        library = next((lib for lib in libraries if lib['title'] == args.name), None)
+        
+        if not library:
+            print(f"{Fore.RED}Error: Library '{args.name}' not found{Style.RESET_ALL}", file=sys.stderr)
+            return 1
+        
+        manifest = exporter.load_manifest() if args.changed else {}
+        if args.changed and exporter.is_unchanged(manifest, library, output_file):
+            print(f"{Fore.YELLOW}Skipping {library['title']}: Unchanged since its last export{Style.RESET_ALL}")
+            return 0
             
-            for i, library in enumerate(libraries, 1):
-                print(f"\n{Fore.CYAN}Processing library {i}/{len(libraries)}: {library['title']}{Style.RESET_ALL}")
-                output_file = export_dir / f"{library['title'].replace(' ', '-')}.csv"
-                
-                if output_file.exists() and not exporter.force:
-                    print(f"{Fore.YELLOW}Skipping {library['title']}: Output file already exists. Use -f to force overwrite.{Style.RESET_ALL}")
-                    skipped_count += 1
-                    continue
-                    
-                success, items_exported = exporter.export_library(library['key'], output_file)
-                if success:
-                    success_count += 1
-                    total_items_exported += items_exported
-                else:
-                    failure_count += 1
-                    print(f"{Fore.RED}Failed to export {library['title']}, continuing with next library...{Style.RESET_ALL}")
+        result = exporter.export_library_exclusive(library['key'], output_file)
+        if result is None:
+            print(f"{Fore.RED}Error: Another instance is exporting to {output_file}{Style.RESET_ALL}", file=sys.stderr)
+            return 4
+        success, items_exported = result
+        if success and items_exported > 0:
+            recorded = {}
+            exporter.record_export(recorded, library, output_file, items_exported, args.changed)
+            exporter.save_manifest(recorded)
+            return 0
+        return 1
+    else:
+        # Export all libraries
+        export_dir = Path(args.dir or PlexLibraryExporter.DEFAULT_OUTPUT_DIR)
+        export_dir.mkdir(parents=True, exist_ok=True)
+        
+        libraries = exporter.get_libraries()
+        # Tallies 'success', 'failure', 'skipped', 'cancelled' and 'items' across libraries
+        totals = Counter()
+        
+        manifest = exporter.load_manifest() if args.changed else {}
+        # Only this run's exports are merged back, so concurrent runs keep theirs
+        recorded = {}
+        exports = []
+        failures = []
+        claimed = set()
+        for i, library in enumerate(libraries, 1):
+            print(f"\n{Fore.CYAN}Processing library {i}/{len(libraries)}: {library['title']}{Style.RESET_ALL}")
+            output_file = export_dir / f"{library['title'].replace(' ', '-')}.csv"
+
+            # Concurrent exports must never share an output file
+            if output_file in claimed:
+                failures.append(f"{Fore.RED}Failed to export {library['title']}: {output_file} is already used by another library{Style.RESET_ALL}")
+                totals['failure'] += 1
+                continue
+            claimed.add(output_file)
+
+            # Checked first, as with -n, so -c reports unchanged libraries with or without -f
+            if args.changed and exporter.is_unchanged(manifest, library, output_file):
+                print(f"{Fore.YELLOW}Skipping {library['title']}: Unchanged since its last export{Style.RESET_ALL}")
+                totals['skipped'] += 1
+                continue
             
-            # Print summary
-            print(f"\n{Fore.CYAN}Export Summary:{Style.RESET_ALL}")
-            print(f"  {Fore.GREEN}Successfully exported libraries: {success_count}{Style.RESET_ALL}")
-            print(f"  {Fore.GREEN}Total items exported: {total_items_exported}{Style.RESET_ALL}")
-            if failure_count > 0:
-                print(f"  {Fore.RED}Failed to export: {failure_count}{Style.RESET_ALL}")
-            if skipped_count > 0:
-                print(f"  {Fore.YELLOW}Skipped (already exists): {skipped_count}{Style.RESET_ALL}")
+            if output_file.exists() and not exporter.force:
+                print(f"{Fore.YELLOW}Skipping {library['title']}: Output file already exists. Use -f to force overwrite.{Style.RESET_ALL}")
+                totals['skipped'] += 1
+                continue
             
-            if success_count > 0:
-                return 0
-            else:
-                print(f"{Fore.RED}Error: No libraries were successfully exported{Style.RESET_ALL}")
-                return 1
-    
-    finally:
-        exporter.remove_lock(lock_fd)
+            exports.append((library, output_file))
+        
+        if args.fail_fast and totals['failure'] > 0:
+            totals['cancelled'] += len(exports)
+            exports = []
+        
+        stopped = threading.Event()
+        
+        def export_queued(library_id: str, output_file: Path) -> Optional[Tuple[bool, int]]:
+            # Checked by the worker itself, which picks up the next library
+            # before the main thread has seen the last one fail
+            if stopped.is_set():
+                raise CancelledError()
+            result = exporter.export_library_exclusive(library_id, output_file)
+            if args.fail_fast and result is not None and not result[0]:
+                stopped.set()
+            return result
+        
+        # Libraries are independent, so export them side by side. Their
+        # progress bars would overwrite each other, so only show one.
+        exporter.show_progress = len(exports) <= 1
+        workers = max(1, min(exporter.LIBRARY_WORKERS, len(exports)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(export_queued, library['key'], output_file): (library, output_file)
+                for library, output_file in exports
+            }
+            try:
+                for future in as_completed(futures):
+                    if future.cancelled() or isinstance(future.exception(), CancelledError):
+                        totals['cancelled'] += 1
+                        continue
+                    library, output_file = futures[future]
+                    result = future.result()
+                    if result is None:
+                        print(f"{Fore.YELLOW}Skipping {library['title']}: Another instance is exporting it{Style.RESET_ALL}")
+                        totals['skipped'] += 1
+                        continue
+                    success, items_exported = result
+                    if success and items_exported == 0:
+                        # Nothing to export, which is neither a success nor a failure
+                        totals['skipped'] += 1
+                        continue
+                    totals.update(success=int(success), failure=int(not success), items=items_exported)
+                    if success:
+                        exporter.record_export(recorded, library, output_file, items_exported, args.changed)
+                    else:
+                        failures.append(f"{Fore.RED}Failed to export {library['title']}{Style.RESET_ALL}")
+                        if args.fail_fast:
+                            # Exports already running are left to finish
+                            for pending in futures:
+                                pending.cancel()
+            except BaseException:
+                # Don't start queued libraries once the run is aborting
+                for future in futures:
+                    future.cancel()
+                exporter.cancel()
+                raise
+        
+        if recorded:
+            exporter.save_manifest(recorded)
+        
+        # Print the failures and summary in one write rather than line by line
+        summary = failures + [
+            f"\n{Fore.CYAN}Export Summary:{Style.RESET_ALL}",
+            f"  {Fore.GREEN}Successfully exported libraries: {totals['success']}{Style.RESET_ALL}",
+            f"  {Fore.GREEN}Total items exported: {totals['items']}{Style.RESET_ALL}",
+        ]
+        if totals['failure'] > 0:
+            summary.append(f"  {Fore.RED}Failed to export: {totals['failure']}{Style.RESET_ALL}")
+        if totals['skipped'] > 0:
+            summary.append(f"  {Fore.YELLOW}Skipped: {totals['skipped']}{Style.RESET_ALL}")
+        if totals['cancelled'] > 0:
+            summary.append(f"  {Fore.YELLOW}Not started after the first failure: {totals['cancelled']}{Style.RESET_ALL}")
+        # Nothing exported and nothing deliberately skipped
+        nothing_done = totals['success'] == 0 and totals['skipped'] == 0
+        if nothing_done:
+            summary.append(f"{Fore.RED}Error: No libraries were successfully exported{Style.RESET_ALL}")
+        print('\n'.join(summary), flush=True)
+        
+        return int(totals['failure'] > 0 or nothing_done)
 
 
 if __name__ == '__main__':